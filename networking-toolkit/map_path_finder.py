@@ -12,18 +12,45 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import ipaddress
 import json
+import os
 import random
 import re
 import socket
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Callable, Dict, Optional, Tuple, List, Union
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; cache writes are then unlocked
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+try:
+    import pytricia
+except ImportError:  # optional C radix trie for CIDR overrides
+    pytricia = None
+
+try:
+    import aiodns
+except ImportError:  # optional; falls back to the system resolver in threads
+    aiodns = None
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # ----------------------------
@@ -42,140 +69,339 @@ LOCAL_IP_OVERRIDES: Dict[str, Dict[str, Any]] = {
 
 
 # ----------------------------
-# Regex helpers
+# IP helpers
 # ----------------------------
 
-IPV4_RE = re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$")
+IPV4_RE = re.compile(r"(?:\d{1,3}\.){3}\d{1,3}", re.ASCII)
 
 
 def looks_like_ipv4(s: Optional[str]) -> bool:
-    if not s:
+    # Cheap dot count rejects hostnames before the regex runs
+    if not s or s.count(".") != 3:
         return False
-    if not IPV4_RE.match(s):
+    if not IPV4_RE.fullmatch(s):
         return False
     # Basic octet sanity check
+    return all(int(x) <= 255 for x in s.split("."))
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_ip(ip: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    """
+    ipaddress.ip_address, memoized; the same hop IPs get parsed over and over.
+    """
     try:
-        parts = [int(x) for x in s.split(".")]
-        return all(0 <= p <= 255 for p in parts)
-    except Exception:
-        return False
+        return ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+
+
+def is_public_ip(ip: str) -> bool:
+    """
+    False for private/loopback/link-local/reserved/CGNAT/multicast addresses;
+    ip-api can only answer status=fail for those, so never send them.
+    """
+    obj = parse_ip(ip)
+    return obj is not None and obj.is_global and not obj.is_multicast
+
+
+# ----------------------------
+# JSON helpers
+# ----------------------------
+
+def loads_json(data: bytes) -> Any:
+    """
+    Parse JSON straight from bytes; orjson if installed.
+    Both parsers raise ValueError subclasses on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# ----------------------------
+# Disk cache (GeoIP / rDNS rarely change)
+# ----------------------------
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pathfinder"
+
+
+class TtlCache:
+    """
+    Tiny JSON file cache: {key: {"record": ..., "expires": unix_ts}}.
+    Loaded once, written back once; flock keeps concurrent runs from clobbering each other.
+    """
+
+    def __init__(self, path: Path, ttl_s: float) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                self._entries = self._parse(f.read())
+        except OSError:
+            pass
+
+    @staticmethod
+    def _parse(text: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(text) if text else {}
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if not isinstance(entry, dict):
+            return None
+        if (entry.get("expires") or 0) < time.time():
+            return None
+        return entry.get("record")
+
+    def put(self, key: str, record: Any) -> None:
+        entry = {"record": record, "expires": int(time.time() + self.ttl_s)}
+        self._entries[key] = entry
+        self._dirty[key] = entry
+
+    def save(self) -> None:
+        """
+        Merge our new entries into whatever is on disk now, dropping expired ones.
+        """
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a+", encoding="utf-8") as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                entries = self._parse(f.read())
+                entries.update(self._dirty)
+                now = time.time()
+                entries = {
+                    k: v for k, v in entries.items()
+                    if isinstance(v, dict) and (v.get("expires") or 0) >= now
+                }
+                f.seek(0)
+                f.truncate()
+                json.dump(entries, f)
+        except OSError as e:
+            print(f"Could not write cache {self.path}: {e}", file=sys.stderr)
+            return
+        self._dirty.clear()
 
 
 # ----------------------------
 # Geo lookup (free, no token)
 # ----------------------------
 
-IP_API_BASE = "http://ip-api.com/json/{q}"
+IP_API_BATCH = "http://ip-api.com/batch"
+IP_API_BATCH_MAX = 100  # ip-api rejects larger batches
 IP_API_FIELDS = "status,message,country,regionName,city,lat,lon,isp,org,as,query"
 
+# ip-api reports its quota in every response: X-Rl = requests left in the window,
+# X-Ttl = seconds until the window resets. The batch endpoint allows 15 per minute.
+_bucket: Dict[str, float] = {"remaining": 15, "reset": 0.0}
+_rate_lock = threading.Lock()
+
+
+def rate_limit_wait() -> None:
+    """
+    Block until there is quota left, then claim one request from it.
+    """
+    while True:
+        with _rate_lock:
+            now = time.time()
+            if _bucket["remaining"] > 0 or now >= _bucket["reset"]:
+                _bucket["remaining"] -= 1
+                return
+            delay = _bucket["reset"] - now
+        time.sleep(delay)
+
+
+def rate_limit_update(r: requests.Response) -> bool:
+    """
+    Record quota from the response headers; False if ip-api did not send them.
+    """
+    try:
+        remaining = int(r.headers["X-Rl"])
+        ttl = int(r.headers["X-Ttl"])
+    except (KeyError, ValueError):
+        return False
+    with _rate_lock:
+        _bucket["remaining"] = remaining
+        _bucket["reset"] = time.time() + ttl
+    return True
+
+
+HTTP_POOL_SIZE = 32
+
+
+def make_session() -> requests.Session:
+    """
+    Keep-alive session with a pool large enough for the parallel fan-out.
+    Retries are handled by our own backoff loops, so urllib3's are disabled.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(total=0),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+def geo_from_ip_api_record(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Normalize one ip-api response object; None unless status=success.
+    """
+    if not isinstance(data, dict) or data.get("status") != "success":
+        return None
+
+    return {
+        "ip": data.get("query"),
+        "city": data.get("city"),
+        "region": data.get("regionName"),
+        "country": data.get("country"),
+        "lat": data.get("lat"),
+        "lon": data.get("lon"),
+        "isp": data.get("isp"),
+        "org": data.get("org"),
+        "as": data.get("as"),
+        "source": "ip-api",
+    }
 
-def geo_from_ip_api(
+
+def geo_batch(
     session: requests.Session,
-    ip: str,
+    ips: List[str],
     timeout_s: float,
     retries: int,
     backoff_s: float,
-) -> Optional[Dict[str, Any]]:
+) -> Dict[str, Dict[str, Any]]:
     """
-    Uses ip-api.com free JSON endpoint.
-    If private/reserved IP: often returns status=fail; we handle it and return None.
+    Uses ip-api.com batch endpoint; one POST per 100 IPs instead of one GET per IP.
+    Returns {ip: geo} for successful lookups only.
     """
-    if not ip or ip == "???":
-        return None
-
-    url = IP_API_BASE.format(q=ip)
+    out: Dict[str, Dict[str, Any]] = {}
     params = {"fields": IP_API_FIELDS}
 
-    for attempt in range(retries + 1):
+    for start in range(0, len(ips), IP_API_BATCH_MAX):
+        chunk = ips[start:start + IP_API_BATCH_MAX]
+        payload = [{"query": ip} for ip in chunk]
+
+        for attempt in range(retries + 1):
+            try:
+                rate_limit_wait()
+                r = session.post(IP_API_BATCH, params=params, json=payload, timeout=timeout_s)
+                known = rate_limit_update(r)
+                if r.status_code == 429:
+                    if not known:
+                        sleep_s = backoff_s * (2**attempt) + random.uniform(0, 0.25)
+                        time.sleep(min(sleep_s, 8.0))
+                    continue
+
+                r.raise_for_status()
+                data = loads_json(r.content)
+                if not isinstance(data, list):
+                    break
+
+                # Responses come back in request order
+                for ip, rec in zip(chunk, data):
+                    g = geo_from_ip_api_record(rec)
+                    if g:
+                        out[ip] = g
+                break
+            except requests.RequestException:
+                if attempt < retries:
+                    sleep_s = backoff_s * (2**attempt) + random.uniform(0, 0.25)
+                    time.sleep(min(sleep_s, 8.0))
+                    continue
+                break
+            except ValueError:
+                break
+
+    return out
+
+
+def compile_overrides(
+    overrides: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[Any, Dict[str, Any]], List[Tuple[Any, Dict[str, Any], str]], Any]:
+    """
+    Split LOCAL_IP_OVERRIDES once into:
+      exact: {ip_address: value}
+      nets:  [(ip_network, value, key)], longest prefix first
+      trie:  pytricia trie of the IPv4 nets if pytricia is installed, else None
+    """
+    exact: Dict[Any, Dict[str, Any]] = {}
+    nets: List[Tuple[Any, Dict[str, Any], str]] = []
+
+    for k, v in overrides.items():
         try:
-            r = session.get(url, params=params, timeout=timeout_s)
-            if r.status_code == 429:
-                # rate limited; exponential backoff + jitter
-                sleep_s = backoff_s * (2**attempt) + random.uniform(0, 0.25)
-                time.sleep(min(sleep_s, 8.0))
-                continue
+            if "/" in k:
+                nets.append((ipaddress.ip_network(k, strict=False), v, k))
+            else:
+                exact[ipaddress.ip_address(k)] = v
+        except ValueError:
+            continue
 
-            r.raise_for_status()
-            data = r.json()
-            if data.get("status") != "success":
-                return None
+    nets.sort(key=lambda t: t[0].prefixlen, reverse=True)
 
-            return {
-                "ip": data.get("query"),
-                "city": data.get("city"),
-                "region": data.get("regionName"),
-                "country": data.get("country"),
-                "lat": data.get("lat"),
-                "lon": data.get("lon"),
-                "isp": data.get("isp"),
-                "org": data.get("org"),
-                "as": data.get("as"),
-                "source": "ip-api",
-            }
-        except requests.RequestException:
-            if attempt < retries:
-                sleep_s = backoff_s * (2**attempt) + random.uniform(0, 0.25)
-                time.sleep(min(sleep_s, 8.0))
-                continue
-            return None
-        except ValueError:
-            return None
+    trie = None
+    if pytricia is not None:
+        trie = pytricia.PyTricia(32)
+        for net, v, k in nets:
+            if net.version == 4:
+                trie[str(net)] = (v, k)
+
+    return exact, nets, trie
 
-    return None
+
+_EXACT_OVERRIDES, _NET_OVERRIDES, _OVERRIDE_TRIE = compile_overrides(LOCAL_IP_OVERRIDES)
 
 
 def geo_from_overrides(ip: str) -> Optional[Dict[str, Any]]:
     """
-    Match exact IP first; then any CIDR keys.
+    Match exact IP first; then the longest matching CIDR key.
     """
     if not ip:
         return None
 
+    ip_obj = parse_ip(ip)
+    if ip_obj is None:
+        return None
+
     # Exact match
-    if ip in LOCAL_IP_OVERRIDES:
-        g = dict(LOCAL_IP_OVERRIDES[ip])
+    v = _EXACT_OVERRIDES.get(ip_obj)
+    if v is not None:
+        g = dict(v)
         g["ip"] = ip
         g["source"] = "override"
         return g
 
-    # CIDR match
-    try:
-        ip_obj = ipaddress.ip_address(ip)
-    except ValueError:
+    # CIDR match (longest prefix)
+    match: Optional[Tuple[Dict[str, Any], str]] = None
+    if _OVERRIDE_TRIE is not None and ip_obj.version == 4:
+        match = _OVERRIDE_TRIE.get(ip)
+    else:
+        for net, v, k in _NET_OVERRIDES:
+            if ip_obj in net:
+                match = (v, k)
+                break
+
+    if match is None:
         return None
 
-    for k, v in LOCAL_IP_OVERRIDES.items():
-        if "/" not in k:
-            continue
-        try:
-            net = ipaddress.ip_network(k, strict=False)
-        except ValueError:
-            continue
-        if ip_obj in net:
-            g = dict(v)
-            g["ip"] = ip
-            g["source"] = "override"
-            g["matched_cidr"] = k
-            return g
-
-    return None
-
-
-def geo_lookup(
-    session: requests.Session,
-    ip: str,
-    timeout_s: float,
-    retries: int,
-    backoff_s: float,
-) -> Optional[Dict[str, Any]]:
-    """
-    Override first; then free API.
-    Includes private IPs by design.
-    """
-    g = geo_from_overrides(ip)
-    if g:
-        return g
-    return geo_from_ip_api(session, ip, timeout_s, retries, backoff_s)
+    v, k = match
+    g = dict(v)
+    g["ip"] = ip
+    g["source"] = "override"
+    g["matched_cidr"] = k
+    return g
 
 
 def marker_from_geo(geo: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -202,23 +428,76 @@ def marker_from_geo(geo: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
 # Reverse DNS
 # ----------------------------
 
-def rdns_lookup(ip: str, timeout_s: float) -> Optional[str]:
+def rdns_lookup(ip: str) -> Optional[str]:
     """
-    Reverse DNS lookup; returns hostname or None.
+    Reverse DNS lookup via the system resolver; returns hostname or None.
+    Blocking; rdns_many bounds it with a timeout instead of touching the global socket timeout.
     """
     if not looks_like_ipv4(ip):
         return None
 
-    # socket.gethostbyaddr uses system resolver; set default timeout
-    old_timeout = socket.getdefaulttimeout()
-    socket.setdefaulttimeout(timeout_s)
     try:
         name, _aliases, _addrs = socket.gethostbyaddr(ip)
         return name
-    except Exception:
+    except OSError:
         return None
-    finally:
-        socket.setdefaulttimeout(old_timeout)
+
+
+def _rdns_thread(loop: asyncio.AbstractEventLoop, fut: asyncio.Future, ip: str) -> None:
+    name = rdns_lookup(ip)
+
+    def deliver() -> None:
+        if not fut.done():  # already timed out / cancelled
+            fut.set_result(name)
+
+    try:
+        loop.call_soon_threadsafe(deliver)
+    except RuntimeError:
+        pass  # loop already closed; nobody is waiting
+
+
+async def _rdns_aiodns(resolver: Any, ip: str, timeout_s: float) -> Optional[str]:
+    if not looks_like_ipv4(ip):
+        return None
+    try:
+        # PTR query for the in-addr.arpa name; result is a pycares HostResult
+        result = await asyncio.wait_for(resolver.gethostbyaddr(ip), timeout_s)
+    except (aiodns.error.DNSError, asyncio.TimeoutError):
+        return None
+    return result.name or None
+
+
+async def rdns_many(ips: List[str], timeout_s: float, workers: int = 16) -> Dict[str, Optional[str]]:
+    """
+    Reverse DNS for many IPs at once.
+    With aiodns every PTR query shares one resolver channel; otherwise each IP
+    gets a daemon resolver thread and we stop waiting after timeout_s, so a
+    stuck system resolver cannot delay exit either.
+    """
+    if not ips:
+        return {}
+
+    if aiodns is not None:
+        resolver = aiodns.DNSResolver(timeout=timeout_s, tries=1)
+        names = await asyncio.gather(*(_rdns_aiodns(resolver, ip, timeout_s) for ip in ips))
+        return dict(zip(ips, names))
+
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(max(1, workers))
+
+    async def one(ip: str) -> Optional[str]:
+        async with sem:
+            fut = loop.create_future()
+            # Daemon thread, not an executor: a lookup stuck past the timeout
+            # must not keep the process alive at exit (executors are joined).
+            threading.Thread(target=_rdns_thread, args=(loop, fut, ip), daemon=True).start()
+            try:
+                return await asyncio.wait_for(fut, timeout_s)
+            except asyncio.TimeoutError:
+                return None
+
+    names = await asyncio.gather(*(one(ip) for ip in ips))
+    return dict(zip(ips, names))
 
 
 # ----------------------------
@@ -243,23 +522,25 @@ def run_mtr_json(target: str, cycles: int, interval: float) -> Dict[str, Any]:
 
     for json_flag in (["--json"], ["-j"]):
         cmd = base + json_flag + [target]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
+        # Stay in bytes; the JSON parser takes them directly
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = proc.communicate()
 
         if proc.returncode != 0:
-            stderr = (proc.stderr or "").strip()
+            err_low = err.lower()
             # If --json unsupported, try -j
-            if json_flag == ["--json"] and ("unknown option" in stderr.lower() or "unrecognized option" in stderr.lower()):
+            if json_flag == ["--json"] and (b"unknown option" in err_low or b"unrecognized option" in err_low):
                 continue
+            stderr = err.decode("utf-8", errors="replace").strip()
             raise RuntimeError(f"mtr failed (code {proc.returncode}): {stderr}")
 
-        out = (proc.stdout or "").strip()
-        if not out:
+        if not out or out.isspace():
             continue
 
         try:
-            return json.loads(out)
-        except json.JSONDecodeError as e:
-            snippet = out[:400].replace("\n", "\\n")
+            return loads_json(out)
+        except ValueError as e:
+            snippet = out[:400].decode("utf-8", errors="replace").replace("\n", "\\n")
             raise RuntimeError(f"Failed to parse mtr JSON: {e}; output starts: {snippet}")
 
     raise RuntimeError("Could not run mtr with JSON output; tried --json and -j.")
@@ -298,7 +579,7 @@ def fnum(x: Any) -> Optional[float]:
         return None
     try:
         return float(x)
-    except Exception:
+    except (TypeError, ValueError):
         return None
 
 
@@ -307,10 +588,97 @@ def inum(x: Any) -> Optional[int]:
         return None
     try:
         return int(x)
-    except Exception:
+    except (TypeError, ValueError):
         return None
 
 
+def first_num(
+    hub: Dict[str, Any],
+    keys: Tuple[str, ...],
+    conv: Callable[[Any], Optional[Any]] = fnum,
+) -> Optional[Any]:
+    """
+    Value of the first key (mtr builds differ in column names) that converts.
+    Unlike chaining `fnum(a) or fnum(b)`, a real 0 is kept instead of skipped.
+    """
+    for k in keys:
+        v = conv(hub.get(k))
+        if v is not None:
+            return v
+    return None
+
+
+# ----------------------------
+# Enrichment
+# ----------------------------
+
+def unique_hop_ips(hubs: List[Dict[str, Any]]) -> List[str]:
+    """
+    Hop IPs in route order, without repeats.
+    """
+    ips: List[str] = []
+    for hub in hubs:
+        ip, _host_field = pick_ip_from_hub(hub)
+        if ip and ip not in ips:
+            ips.append(ip)
+    return ips
+
+
+def enrich_ips(
+    ips: List[str],
+    session: requests.Session,
+    args: argparse.Namespace,
+    geo_cache: Optional[TtlCache],
+    rdns_cache: Optional[TtlCache],
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Optional[str]]]:
+    """
+    GeoIP (+ rDNS if enabled) for a set of IPs.
+    Overrides and cache hits are local; other public IPs go to ip-api in as few
+    batches as possible, side by side with the rDNS queries.
+    New positive answers are put into the caches (caller saves).
+    """
+    geo_by_ip: Dict[str, Dict[str, Any]] = {}
+    api_ips: List[str] = []
+    for ip in ips:
+        g = geo_from_overrides(ip) or (geo_cache.get(ip) if geo_cache else None)
+        if g:
+            geo_by_ip[ip] = g
+        elif is_public_ip(ip):
+            api_ips.append(ip)
+
+    rdns_by_ip: Dict[str, Optional[str]] = {}
+    rdns_ips: List[str] = []
+    if args.rdns:
+        for ip in ips:
+            name = rdns_cache.get(ip) if rdns_cache else None
+            if name:
+                rdns_by_ip[ip] = name
+            else:
+                rdns_ips.append(ip)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        geo_future = executor.submit(
+            geo_batch, session, api_ips, args.geo_timeout, args.geo_retries, args.geo_backoff
+        )
+        rdns_future = executor.submit(asyncio.run, rdns_many(rdns_ips, args.rdns_timeout, args.workers))
+        api_geo = geo_future.result()
+        new_rdns = rdns_future.result()
+
+    geo_by_ip.update(api_geo)
+    rdns_by_ip.update(new_rdns)
+
+    # Only cache positive answers; failures may be transient.
+    if geo_cache:
+        for ip, g in api_geo.items():
+            geo_cache.put(ip, g)
+    if rdns_cache:
+        for ip, name in new_rdns.items():
+            if name:
+                rdns_cache.put(ip, name)
+
+    return geo_by_ip, rdns_by_ip
+
+
 # ----------------------------
 # Main
 # ----------------------------
@@ -320,6 +688,7 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("target", help="Target hostname or IP.")
     p.add_argument("-c", "--cycles", type=int, default=2, help="Report cycles per hop.")
     p.add_argument("-i", "--interval", type=float, default=1.0, help="Interval seconds.")
+    p.add_argument("--no-prescan", action="store_true", help="Do not enrich from a quick 1-cycle mtr while the full run is going. Hops seen only by that quick pass are still looked up and cached.")
     p.add_argument("--out", default="route_map.json", help="Output JSON file path.")
 
     p.add_argument("--geo-timeout", type=float, default=5.0)
@@ -327,7 +696,14 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--geo-backoff", type=float, default=0.5)
 
     p.add_argument("--rdns", action="store_true", help="Do reverse DNS on hop IPs.")
-    p.add_argument("--rdns-timeout", type=float, default=1.0)
+    p.add_argument("--rdns-timeout", type=float, default=1.0, help="Seconds to wait per rDNS lookup.")
+
+    p.add_argument("--workers", type=int, default=16, help="Concurrent rDNS lookups without aiodns.")
+
+    p.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="GeoIP/rDNS cache directory.")
+    p.add_argument("--geo-cache-ttl", type=float, default=168.0, help="GeoIP cache lifetime in hours.")
+    p.add_argument("--rdns-cache-ttl", type=float, default=12.0, help="rDNS cache lifetime in hours.")
+    p.add_argument("--no-cache", action="store_true", help="Skip the on-disk GeoIP/rDNS cache.")
 
     p.add_argument("--include-raw-mtr", action="store_true", help="Embed raw mtr JSON in output.")
     return p.parse_args()
@@ -339,17 +715,63 @@ def main() -> int:
     print(f"📡 SCANNING ROUTE TO: {args.target}")
     print("=" * 88)
 
+    geo_cache: Optional[TtlCache] = None
+    rdns_cache: Optional[TtlCache] = None
+    if not args.no_cache:
+        cache_dir = Path(args.cache_dir).expanduser()
+        geo_cache = TtlCache(cache_dir / "geo.json", args.geo_cache_ttl * 3600)
+        rdns_cache = TtlCache(cache_dir / "rdns.json", args.rdns_cache_ttl * 3600)
+
+    session = make_session()
+    geo_by_ip: Dict[str, Dict[str, Any]] = {}
+    rdns_by_ip: Dict[str, Optional[str]] = {}
+    enriched: set = set()
+
+    def enrich(ips: List[str]) -> None:
+        todo = [ip for ip in ips if ip not in enriched]
+        if not todo:
+            return
+        g, r = enrich_ips(todo, session, args, geo_cache, rdns_cache)
+        geo_by_ip.update(g)
+        # A retry must not overwrite a name found on an earlier pass with None
+        rdns_by_ip.update({ip: name for ip, name in r.items() if name or ip not in rdns_by_ip})
+        # Done only once geo came back (or ip-api would never be asked); public
+        # IPs whose lookup failed on the quick pass are retried after the full run
+        enriched.update(ip for ip in todo if ip in g or not is_public_ip(ip))
+
+    # The full mtr run is mostly idle waiting on probe intervals; run it in the
+    # background and enrich the hops from a quick single-cycle pass meanwhile.
+    mtr_pool = ThreadPoolExecutor(max_workers=1)
+    full_future = mtr_pool.submit(run_mtr_json, args.target, args.cycles, args.interval)
+
+    if args.cycles > 1 and not args.no_prescan:
+        try:
+            quick = run_mtr_json(args.target, 1, args.interval)
+        except Exception:
+            quick = None  # the full run will surface any real error
+        if quick:
+            enrich(unique_hop_ips(get_hops(quick)))
+
     try:
-        raw = run_mtr_json(args.target, args.cycles, args.interval)
+        raw = full_future.result()
     except FileNotFoundError:
         print("mtr not found; install it first.", file=sys.stderr)
         return 2
     except Exception as e:
         print(f"Failed to run mtr: {e}", file=sys.stderr)
         return 2
+    finally:
+        mtr_pool.shutdown()
 
     hubs = get_hops(raw)
-    session = requests.Session()
+
+    # Route may have shifted between passes; pick up any hops the quick pass missed
+    enrich(unique_hop_ips(hubs))
+
+    if geo_cache:
+        geo_cache.save()
+    if rdns_cache:
+        rdns_cache.save()
 
     hops_out: List[Dict[str, Any]] = []
 
@@ -358,13 +780,13 @@ def main() -> int:
 
         ip, host_field = pick_ip_from_hub(hub)
 
-        loss_pct = fnum(hub.get("Loss%")) or fnum(hub.get("Loss")) or fnum(hub.get("loss"))
-        sent = inum(hub.get("Snt")) or inum(hub.get("Sent")) or inum(hub.get("snt"))
+        loss_pct = first_num(hub, ("Loss%", "Loss", "loss"))
+        sent = first_num(hub, ("Snt", "Sent", "snt"), inum)
         last_ms = fnum(hub.get("Last"))
         avg_ms = fnum(hub.get("Avg"))
         best_ms = fnum(hub.get("Best"))
-        worst_ms = fnum(hub.get("Wrst")) or fnum(hub.get("Worst"))
-        stdev_ms = fnum(hub.get("StDev")) or fnum(hub.get("Stdev"))
+        worst_ms = first_num(hub, ("Wrst", "Worst"))
+        stdev_ms = first_num(hub, ("StDev", "Stdev"))
 
         # If 100% loss and no IP, skip lookups
         geo = None
@@ -372,10 +794,9 @@ def main() -> int:
         rdns = None
 
         if ip:
-            geo = geo_lookup(session, ip, args.geo_timeout, args.geo_retries, args.geo_backoff)
+            geo = geo_by_ip.get(ip)
             marker = marker_from_geo(geo)
-            if args.rdns:
-                rdns = rdns_lookup(ip, args.rdns_timeout)
+            rdns = rdns_by_ip.get(ip)
 
         # Pretty print like your desired format
         ms_str = f"{avg_ms:.2f}ms" if avg_ms is not None else "n/a"
@@ -426,7 +847,12 @@ def main() -> int:
         out_obj["raw_mtr"] = raw
 
     out_path = Path(args.out)
-    out_path.write_text(json.dumps(out_obj, indent=2), encoding="utf-8")
+    if orjson is not None:
+        out_path.write_bytes(orjson.dumps(out_obj, option=orjson.OPT_INDENT_2))
+    else:
+        # json.dump streams encoder chunks to the file; no full document string
+        with out_path.open("w", encoding="utf-8") as f:
+            json.dump(out_obj, f, indent=2)
 
     print(f"\n✅ Success! JSON saved to: {out_path.resolve()}")
     return 0
@@ -1,6 +1,9 @@
 import subprocess
 import platform
 
+_IS_WINDOWS = platform.system().lower() == 'windows'
+_TRACE_CMD = 'tracert' if _IS_WINDOWS else 'traceroute'
+
 # Using known IP gateways for DO Regions
 targets = {
     "Toronto (TOR1)": "159.203.0.1",
@@ -11,7 +14,6 @@ targets = {
 
 def run_diagnostics(name, ip):
     print(f"\n--- Testing {name} ({ip}) ---")
-    param = '-n' if platform.system().lower() == 'windows' else '-c'
     
     # Simple Ping
     # try:
@@ -21,10 +23,9 @@ def run_diagnostics(name, ip):
     #     print("Ping: Failed")
 
     # Quick Traceroute (limited to 10 hops for speed)
-    trace_cmd = 'tracert' if platform.system().lower() == 'windows' else 'traceroute'
     try:
         # We only take the first few lines to see the initial Chicago exit points
-        trace = subprocess.check_output([trace_cmd, '-m', '10', ip]).decode('utf-8')
+        trace = subprocess.check_output([_TRACE_CMD, '-m', '10', ip]).decode('utf-8')
         print("Traceroute (First 10 hops):")
         print("\n".join(trace.splitlines()[:10]))
     except:
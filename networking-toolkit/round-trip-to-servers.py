@@ -1,32 +1,64 @@
-import subprocess
-import socket
+import asyncio
 import time
 import platform
+from statistics import fmean
 
-def get_ping(host):
-	param = '-n' if platform.system().lower() == 'windows' else '-c'
+try:
+	from icmplib import ICMPLibError, async_ping
+except ImportError:  # optional; falls back to the system ping binary
+	async_ping = None
+
+_IS_WINDOWS = platform.system().lower() == 'windows'
+_PING_PARAM = '-n' if _IS_WINDOWS else '-c'
+
+PROBES_PER_SERVER = 10
+MAX_IN_FLIGHT = 20  # keep bursts of SYNs/pings small enough not to look like a flood
+
+async def get_ping(host):
+	# In-process ICMP (unprivileged datagram socket on Linux/macOS): no fork, no output parsing
+	if async_ping is not None:
+		try:
+			r = await async_ping(host, count=1, timeout=1, privileged=False)
+			return r.avg_rtt if r.is_alive else None
+		except ICMPLibError:
+			pass  # e.g. ping_group_range forbids unprivileged ICMP; use the binary
+	return await get_ping_exec(host)
+
+async def get_ping_exec(host):
 	try:
-		output = subprocess.check_output(['ping', param, '1', host], stderr=subprocess.STDOUT).decode('utf-8')
-		if platform.system().lower() == 'windows':
+		proc = await asyncio.create_subprocess_exec(
+			'ping', _PING_PARAM, '1', host,
+			stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+		out, _ = await proc.communicate()
+		if proc.returncode != 0:
+			return None
+		output = out.decode('utf-8')
+		if _IS_WINDOWS:
 			# Extract time from Windows output format
 			return float(output.split('time=')[1].split('ms')[0])
 		else:
 			# Extract time from Linux/Mac output format
 			return float(output.split('time=')[1].split(' ')[0])
-	except:
+	except (ValueError, IndexError, OSError):
 		return None
 
-def get_tcp(host, port):
-	s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-	s.settimeout(1.0)
+async def get_tcp(host, port):
 	start = time.perf_counter()
 	try:
-		s.connect((host, port))
-		duration = (time.perf_counter() - start) * 1000
-		s.close()
-		return duration
-	except:
+		_reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 1.0)
+	except (asyncio.TimeoutError, OSError, ValueError):
 		return None
+	duration = (time.perf_counter() - start) * 1000
+	writer.close()
+	try:
+		await writer.wait_closed()
+	except OSError:
+		pass
+	return duration
+
+async def limited(sem, coro):
+	async with sem:
+		return await coro
 
 servers = [
 	{"name": "TOR1 (Jump)", "ip": "...", "mc_port": 22},
@@ -35,27 +67,30 @@ servers = [
 	{"name": "SFO3 (Jump)", "ip": "...", "mc_port": 25565}
 ]
 
-print(f"{'Server Name':<15} | {'ICMP Ping':<12} | {'TCP Port Test':<15}")
-print("-" * 50)
-
-for srv in servers:
-	p_times = []
-	t_times = []
-	for i in range(10):
-		p_times.append(get_ping(srv['ip']))
-		t_times.append(get_tcp(srv['ip'], srv['mc_port']))
-  
-	total = 0.0
-	for t in p_times:
-		total += t
-	p_avg = total / len(p_times)
- 
-	total = 0.0
-	for t in t_times:
-		total += t
-	t_avg = total / len(t_times)
-	
-	p_str = f"{p_avg:.2f}ms" if p_avg else "FAIL"
-	t_str = f"{t_avg:.2f}ms" if t_avg else "CLOSED"
-	
-	print(f"{srv['name']:<15} | {p_str:<12} | {t_str:<15}")
\ No newline at end of file
+async def probe_server(sem, srv):
+	pings = [limited(sem, get_ping(srv['ip'])) for _ in range(PROBES_PER_SERVER)]
+	tcps = [limited(sem, get_tcp(srv['ip'], srv['mc_port'])) for _ in range(PROBES_PER_SERVER)]
+	results = await asyncio.gather(*pings, *tcps)
+	return results[:PROBES_PER_SERVER], results[PROBES_PER_SERVER:]
+
+async def main():
+	# Every (server, probe) pair runs at once; the semaphore caps how many are in flight
+	sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+	results = await asyncio.gather(*(probe_server(sem, srv) for srv in servers))
+
+	print(f"{'Server Name':<15} | {'ICMP Ping':<12} | {'TCP Port Test':<15}")
+	print("-" * 50)
+
+	for srv, (p_times, t_times) in zip(servers, results):
+		# Failed probes come back as None; average only the ones that answered
+		p_ok = [t for t in p_times if t is not None]
+		t_ok = [t for t in t_times if t is not None]
+		p_avg = fmean(p_ok) if p_ok else None
+		t_avg = fmean(t_ok) if t_ok else None
+		
+		p_str = f"{p_avg:.2f}ms" if p_avg else "FAIL"
+		t_str = f"{t_avg:.2f}ms" if t_avg else "CLOSED"
+		
+		print(f"{srv['name']:<15} | {p_str:<12} | {t_str:<15}")
+
+asyncio.run(main())